@@ -14,6 +14,7 @@ from dotenv import load_dotenv
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 load_dotenv(PROJECT_ROOT / ".env")
 RAW_DIR = PROJECT_ROOT / "data" / "raw"
+PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
 META_DIR = PROJECT_ROOT / "data" / "metadata"
 INGEST_LOG_PATH = META_DIR / "ingest_log.json"
 SOURCES_MD_PATH = META_DIR / "sources.md"
@@ -18,6 +18,7 @@ from ._utils import (
     dataframe_ingest_stats,
 )
 from ._http import get_with_retries
+from .snapshots import commit_run
 
 # ACS 5-year detailed table variables (ZCTA-level)
 # B01003_001E: Total population
@@ -100,6 +101,7 @@ def run(year: int, *, state: str | None = None) -> Path:
             "link": f"{CENSUS_BASE}/{year}/acs/acs5",
         }
     )
+    commit_run(f"acs_{year}", df, out_path)
     print(f"Acquired {len(df)} ZCTAs -> {out_path}")
     return out_path
 
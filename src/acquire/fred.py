@@ -18,6 +18,7 @@ from ._utils import (
     dataframe_ingest_stats,
 )
 from ._http import get_with_retries
+from .snapshots import commit_run
 
 FRED_BASE = "https://api.stlouisfed.org/fred/series/observations"
 # 30-year fixed mortgage rate, Fed funds rate
@@ -85,6 +86,7 @@ def run(start: str, end: str, *, series: list[str] | None = None) -> Path:
             "link": "https://fred.stlouisfed.org/docs/api/fred/",
         }
     )
+    commit_run("fred", df, out_path)
     print(f"Acquired {len(df)} observations -> {out_path}")
     return out_path
 
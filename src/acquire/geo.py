@@ -5,6 +5,7 @@ from __future__ import annotations
 import argparse
 from datetime import datetime
 from pathlib import Path
+from typing import Iterable
 
 from ._utils import RAW_DIR, ensure_dirs, write_sources_md
 from ._http import get_with_retries
@@ -12,10 +13,94 @@ from ._http import get_with_retries
 # Census TIGER ZCTA 5-digit boundaries (national, ~504MB)
 ZCTA_SHAPEFILE_URL = "https://www2.census.gov/geo/tiger/TIGER2023/ZCTA520/tl_2023_us_zcta520.zip"
 GEO_DIR = RAW_DIR / "geo"
+NYC_ZCTA_PATH = GEO_DIR / "nyc_zcta520.parquet"
 
+# NYC extent (minx, miny, maxx, maxy) in lon/lat; TIGER is NAD83 (EPSG:4269)
+NYC_BBOX = (-74.2591, 40.4774, -73.7002, 40.9176)
+# The bbox also catches NJ, Westchester and Nassau ZCTAs; keep only NYC ZIP
+# prefixes (Manhattan 100-102, Staten Island 103, Bronx 104, Queens LIC 111,
+# Brooklyn 112, Queens 113-114, Rockaway 116). 110xx is mostly Nassau, so only
+# its Queens ZCTAs (Glen Oaks, Floral Park) are listed explicitly.
+NYC_ZIP_PREFIXES = ("100", "101", "102", "103", "104", "111", "112", "113", "114", "116")
+NYC_110_ZCTAS = ("11004", "11005")
+# Small row groups so GeoParquet bbox filters can skip most of the file
+NYC_ROW_GROUP_SIZE = 32
+GEO_EXTRA_MODULES = ("geopandas", "pyogrio", "shapely")
+GEO_EXTRA_HINT = 'pip install -e ".[geo]"'
 
-def run(*, year: int = 2023) -> Path:
-    """Download ZCTA boundary shapefile and store in data/raw/geo/."""
+
+def _geo_available() -> bool:
+    """True if the optional geo dependencies for the NYC GeoParquet stage are installed."""
+    from importlib.util import find_spec
+
+    return all(find_spec(m) is not None for m in GEO_EXTRA_MODULES)
+
+
+def is_nyc_zcta(zcta: str) -> bool:
+    """True if a 5-digit ZCTA belongs to one of the five boroughs."""
+    return zcta[:3] in NYC_ZIP_PREFIXES or zcta in NYC_110_ZCTAS
+
+
+def to_nyc_geoparquet(
+    zip_path: Path,
+    *,
+    out_path: Path = NYC_ZCTA_PATH,
+    simplify: float | None = None,
+    zips: Iterable[str] | None = None,
+) -> Path:
+    """Extract NYC ZCTAs from the national shapefile and write a spatially sorted GeoParquet.
+
+    Only features intersecting NYC_BBOX are read (pyogrio bbox filter), so the
+    national file is never fully parsed; those are then narrowed to NYC ZCTAs
+    (is_nyc_zcta, or exactly zips if given, e.g. the processed panel's ZIPs).
+    Polygons are kept whole, not clipped to the bbox. simplify is a tolerance
+    in degrees. Requires the optional geo dependencies (geopandas, pyogrio, shapely).
+    """
+    if not _geo_available():
+        raise ImportError(f"NYC GeoParquet stage needs {', '.join(GEO_EXTRA_MODULES)}. Install with {GEO_EXTRA_HINT}")
+    from pyogrio import read_dataframe
+
+    gdf = read_dataframe(zip_path, bbox=NYC_BBOX)
+    zcta_col = next(c for c in gdf.columns if c.startswith("ZCTA5CE"))
+    gdf = gdf.rename(columns={zcta_col: "zip"})[["zip", "geometry"]]
+    keep = gdf["zip"].isin(set(zips)) if zips is not None else gdf["zip"].map(is_nyc_zcta)
+    gdf = gdf[keep]
+    if simplify:
+        gdf["geometry"] = gdf.geometry.simplify(simplify, preserve_topology=True)
+    # Hilbert order keeps nearby polygons in the same row groups
+    gdf = gdf.iloc[gdf.hilbert_distance().argsort().to_numpy()].reset_index(drop=True)
+    ensure_dirs(out_path.parent)
+    gdf.to_parquet(
+        out_path,
+        index=False,
+        write_covering_bbox=True,
+        row_group_size=NYC_ROW_GROUP_SIZE,
+    )
+    print(
+        f"Wrote {len(gdf)} NYC ZCTAs -> {out_path} ({out_path.stat().st_size / 1e6:.1f} MB)"
+    )
+    return out_path
+
+
+def load_nyc_zcta(
+    bbox: tuple[float, float, float, float] | None = None,
+    path: Path = NYC_ZCTA_PATH,
+) -> object:
+    """Load NYC ZCTA polygons (GeoDataFrame), optionally only those intersecting bbox."""
+    import geopandas as gpd
+
+    return gpd.read_parquet(path, bbox=bbox)
+
+
+def run(*, year: int = 2023, nyc: bool = True, simplify: float | None = None) -> Path:
+    """Download ZCTA boundary shapefile and store in data/raw/geo/.
+
+    With nyc, also write the NYC ZCTA GeoParquet (see to_nyc_geoparquet). The
+    stage is skipped, before downloading, if the optional geo extra is missing.
+    """
+    if nyc and not _geo_available():
+        print(f"Skipping NYC GeoParquet stage: {', '.join(GEO_EXTRA_MODULES)} not installed ({GEO_EXTRA_HINT}).")
+        nyc = False
     ensure_dirs(GEO_DIR)
     # Use 2023 ZCTA520
     url = ZCTA_SHAPEFILE_URL
@@ -37,15 +122,33 @@ def run(*, year: int = 2023) -> Path:
             "link": "https://www2.census.gov/geo/tiger/TIGER2023/ZCTA520/",
         }
     )
-    print(f"Downloaded ZCTA boundaries -> {out_path} ({len(out_path.read_bytes()) / 1e6:.1f} MB)")
+    print(f"Downloaded ZCTA boundaries -> {out_path} ({out_path.stat().st_size / 1e6:.1f} MB)")
+    if nyc:
+        to_nyc_geoparquet(out_path, simplify=simplify)
     return out_path
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Acquire ZCTA boundary files")
     parser.add_argument("--year", type=int, default=2023, help="TIGER release year")
+    parser.add_argument("--no-nyc", action="store_true", help="Skip the NYC GeoParquet stage")
+    parser.add_argument(
+        "--simplify",
+        type=float,
+        default=None,
+        help="Simplification tolerance in degrees for NYC polygons (e.g. 0.0001)",
+    )
+    parser.add_argument(
+        "--from-zip",
+        type=Path,
+        default=None,
+        help="Build the NYC GeoParquet from an existing download instead of downloading",
+    )
     args = parser.parse_args()
-    run(year=args.year)
+    if args.from_zip:
+        to_nyc_geoparquet(args.from_zip, simplify=args.simplify)
+    else:
+        run(year=args.year, nyc=not args.no_nyc, simplify=args.simplify)
 
 
 if __name__ == "__main__":
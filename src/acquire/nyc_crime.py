@@ -17,6 +17,7 @@ from ._utils import (
     dataframe_ingest_stats,
 )
 from ._http import get_with_retries
+from .snapshots import commit_run
 
 # NYC Open Data Socrata endpoints
 # Current YTD: 5uac-w243 | Historic (2006-2019): qgea-i56i
@@ -66,9 +67,12 @@ def fetch_nypd_date_range(
 def run(start: str, end: str, *, dataset: str = "current") -> Path:
     """Acquire NYPD complaint data and save as parquet."""
     dataset_id = NYPD_HISTORIC_ID if dataset == "historic" else NYPD_CURRENT_ID
+    # Separate filename prefix (= snapshot key) per dataset so current and historic
+    # runs never diff against each other
+    prefix = "nyc_crime" if dataset == "current" else f"nyc_crime_{dataset}"
     ensure_dirs(RAW_DIR / "nyc_crime")
     df = fetch_nypd_date_range(start, end, dataset_id=dataset_id)
-    out_name = timestamped_filename("nyc_crime", "parquet")
+    out_name = timestamped_filename(prefix, "parquet")
     out_path = RAW_DIR / "nyc_crime" / out_name
     df.to_parquet(out_path, index=False)
     stats = dataframe_ingest_stats(df)
@@ -89,6 +93,7 @@ def run(start: str, end: str, *, dataset: str = "current") -> Path:
             "link": f"https://data.cityofnewyork.us (dataset={dataset_id})",
         }
     )
+    commit_run(prefix, df, out_path)
     print(f"Acquired {len(df)} rows -> {out_path}")
     return out_path
 
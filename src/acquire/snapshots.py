@@ -0,0 +1,375 @@
+"""Deduplicated snapshot store for raw acquirer outputs: one compacted base plus per-run deltas.
+
+Each dataset key (the timestamped filename prefix, e.g. nyc_crime, acs_2023,
+zillow_zhvi, fred) gets a store under data/raw/<source>/_store/<key>/:
+
+    manifest.json                     versions, labels, row counts, columns
+    base.vNNNNNN/<bucket>/*.parquet   full state at base_version, partitioned by row hash
+    deltas/vNNNNNN.add.parquet        rows added by version N
+    deltas/vNNNNNN.del.parquet        row ids removed by version N
+    deltas/vNNNNNN.attrs.parquet      descriptive columns of version N (wide files only)
+
+Rows are identified by a content hash, so a run that re-downloads mostly
+unchanged data only stores the rows that changed. Wide files with one
+column per date (Zillow) are stored in long form (RegionID, date, value)
+with the descriptive columns (SizeRank, City, Metro, ...) kept as a small
+per-version table, so a new release only adds its new month and any
+revised cells.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from ._utils import RAW_DIR, ensure_dirs
+
+SOURCE_DIRS = ("nyc_crime", "acs", "zillow", "fred")
+STORE_DIRNAME = "_store"
+ROW_ID = "_row_id"
+BUCKET = "bucket"
+N_BUCKETS = 16
+DEFAULT_KEEP = 3
+# Wide-format date columns, e.g. Zillow's 2024-01-31
+DATE_COL_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+LONG_DATE = "date"
+LONG_VALUE = "value"
+# Unique, non-null region id used to key long rows, in order of preference
+LONG_KEY_CANDIDATES = ("RegionID", "RegionName")
+DELTA_OPS = ("add", "del")
+ATTRS_OP = "attrs"
+
+
+def _source_dir(key: str) -> Path:
+    for d in SOURCE_DIRS:
+        if key == d or key.startswith(f"{d}_"):
+            return RAW_DIR / d
+    raise ValueError(f"Unknown dataset key: {key}. Expected a prefix starting with one of {SOURCE_DIRS}.")
+
+
+def store_dir(key: str) -> Path:
+    """Return data/raw/<source>/_store/<key>/."""
+    return _source_dir(key) / STORE_DIRNAME / key
+
+
+def _raw_pattern(key: str) -> re.Pattern:
+    """Match timestamped raw files written for key: <key>_YYYYMMDD_HHMMSS.<csv|parquet>."""
+    return re.compile(rf"^{re.escape(key)}_\d{{8}}_\d{{6}}\.(csv|parquet)$")
+
+
+def _read_raw(path: Path) -> pd.DataFrame:
+    return pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+
+
+def _canonical(value: object) -> object:
+    """Plain-Python form of a nested cell; None entries dropped so Socrata JSON and parquet structs agree."""
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def _hashable(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of df with dict/list cells (e.g. NYPD lat_lon, geocoded_column) JSON-encoded."""
+    out = df
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        sample = df[col].dropna()
+        if sample.empty or not isinstance(sample.iloc[0], (dict, list, tuple, np.ndarray)):
+            continue
+        if out is df:
+            out = df.copy()
+        out[col] = df[col].map(
+            lambda v: None if v is None else json.dumps(_canonical(v), sort_keys=True, default=str)
+        )
+    return out
+
+
+def _row_ids(df: pd.DataFrame) -> pd.Series:
+    """Content hash per row; repeated identical rows get distinct ids by occurrence."""
+    h = pd.util.hash_pandas_object(_hashable(df), index=False).to_numpy()
+    occurrence = pd.Series(h).groupby(h).cumcount().to_numpy()
+    keyed = pd.DataFrame({"h": h, "n": occurrence})
+    return pd.Series(pd.util.hash_pandas_object(keyed, index=False).to_numpy(), index=df.index)
+
+
+def _to_long(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame, str] | None:
+    """Split a wide table (one column per date) into long (key, date, value) rows and
+    its descriptive columns. None if df is not wide or has no usable region key."""
+    date_cols = [c for c in df.columns if DATE_COL_RE.match(str(c))]
+    attr_cols = [c for c in df.columns if c not in date_cols]
+    if len(date_cols) < 2 or {LONG_DATE, LONG_VALUE} & set(attr_cols):
+        return None
+    key = next(
+        (c for c in LONG_KEY_CANDIDATES if c in attr_cols and df[c].notna().all() and df[c].is_unique),
+        None,
+    )
+    if key is None:
+        return None
+    long = df[[key, *date_cols]].melt(id_vars=[key], var_name=LONG_DATE, value_name=LONG_VALUE)
+    return long, df[attr_cols], key
+
+
+def _to_wide(state: pd.DataFrame, attrs: pd.DataFrame, key: str, columns: list[str]) -> pd.DataFrame:
+    """Inverse of _to_long for one version's rows, in the version's original row order."""
+    wide = state.pivot(index=key, columns=LONG_DATE, values=LONG_VALUE)
+    return attrs.join(wide, on=key).reindex(columns=columns).reset_index(drop=True)
+
+
+def _load_manifest(key: str) -> dict:
+    path = store_dir(key) / "manifest.json"
+    if not path.exists():
+        return {"key": key, "base_version": 0, "versions": []}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_manifest(key: str, manifest: dict) -> None:
+    path = store_dir(key) / "manifest.json"
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    tmp.replace(path)
+
+
+def _delta_path(key: str, version: int, op: str) -> Path:
+    return store_dir(key) / "deltas" / f"v{version:06d}.{op}.parquet"
+
+
+def _latest_version(manifest: dict) -> int:
+    return manifest["versions"][-1]["version"] if manifest["versions"] else 0
+
+
+def _base_name(version: int) -> str:
+    return f"base.v{version:06d}"
+
+
+def _state(key: str, manifest: dict, version: int, *, ids_only: bool = False) -> pd.DataFrame:
+    """Rows (with _row_id) present at version, from base plus deltas up to version."""
+    base_version = manifest["base_version"]
+    if version < base_version:
+        raise ValueError(f"{key} v{version} was compacted away (oldest available: v{base_version})")
+    columns = [ROW_ID] if ids_only else None
+    if base_version:
+        base_dir = store_dir(key) / manifest.get("base_dir", "base")
+        if not base_dir.exists():
+            raise FileNotFoundError(f"{key}: base for v{base_version} is missing at {base_dir}")
+        state = pd.read_parquet(base_dir, columns=columns)
+    else:
+        state = pd.DataFrame({ROW_ID: pd.Series(dtype="uint64")})
+    parts = [state]
+    for v in range(base_version + 1, version + 1):
+        del_path = _delta_path(key, v, "del")
+        if del_path.exists():
+            dropped = set(pd.read_parquet(del_path)[ROW_ID])
+            parts = [p[~p[ROW_ID].isin(dropped)] for p in parts]
+        add_path = _delta_path(key, v, "add")
+        if add_path.exists():
+            parts.append(pd.read_parquet(add_path, columns=columns))
+    parts = [p for p in parts if len(p)] or parts[:1]
+    return pd.concat(parts, ignore_index=True)
+
+
+def commit(key: str, df: pd.DataFrame, *, label: str | None = None) -> int:
+    """Store df as the next version of key, writing only added/removed rows. Returns the version."""
+    ensure_dirs(store_dir(key) / "deltas")
+    manifest = _load_manifest(key)
+    latest = _latest_version(manifest)
+    version = latest + 1
+    # Files for `version` can only be leftovers of a commit that failed before saving the
+    # manifest; _state would apply them on top of this commit's deltas, so clear them first.
+    for op in (*DELTA_OPS, ATTRS_OP):
+        _delta_path(key, version, op).unlink(missing_ok=True)
+    current = _state(key, manifest, latest, ids_only=True)[ROW_ID] if latest else pd.Series(dtype="uint64")
+
+    # The layout is fixed by the first version so every delta holds the same kind of row
+    long = _to_long(df)
+    if "layout" not in manifest:
+        manifest["layout"] = "rows" if latest or long is None else "long"
+    key_col = None
+    rows = df
+    if manifest["layout"] == "long":
+        if long is None:
+            raise ValueError(f"{key} is stored in long form but this snapshot has no wide date columns")
+        rows, attrs, key_col = long
+        attrs.to_parquet(_delta_path(key, version, ATTRS_OP), index=False)
+
+    ids = _row_ids(rows)
+    is_new = ~ids.isin(current)
+    removed = current[~current.isin(ids)]
+    added = rows[is_new.to_numpy()].assign(**{ROW_ID: ids[is_new].to_numpy()})
+    if len(added):
+        added.to_parquet(_delta_path(key, version, "add"), index=False)
+    if len(removed):
+        pd.DataFrame({ROW_ID: removed.to_numpy()}).to_parquet(_delta_path(key, version, "del"), index=False)
+
+    manifest["versions"].append(
+        {
+            "version": version,
+            "label": label,
+            "created": datetime.now().isoformat(),
+            "rows": int(len(df)),
+            "added": int(len(added)),
+            "removed": int(len(removed)),
+            "columns": [str(c) for c in df.columns],
+            "key_column": key_col,
+        }
+    )
+    _save_manifest(key, manifest)
+    return version
+
+
+def commit_file(key: str, path: Path) -> int:
+    """Commit a raw acquirer output file as the next version of key."""
+    version = commit(key, _read_raw(path), label=path.name)
+    print(f"Snapshot {key} v{version} <- {path.name}")
+    return version
+
+
+def commit_run(key: str, df: pd.DataFrame, out_path: Path) -> int | None:
+    """Commit an acquirer's in-memory output. Non-fatal: the raw file at out_path is already saved."""
+    try:
+        version = commit(key, df, label=out_path.name)
+    except Exception as e:
+        print(f"Warning: snapshot commit for {key} failed ({e}); raw file kept at {out_path}")
+        return None
+    print(f"Snapshot {key} v{version} <- {out_path.name}")
+    return version
+
+
+def load(key: str, version: int | None = None) -> pd.DataFrame:
+    """Reconstruct the snapshot of key at version (default: latest). Row order is not preserved."""
+    manifest = _load_manifest(key)
+    if not manifest["versions"]:
+        raise FileNotFoundError(f"No snapshots stored for {key} in {store_dir(key)}")
+    if version is None:
+        version = _latest_version(manifest)
+    entry = next((e for e in manifest["versions"] if e["version"] == version), None)
+    if entry is None:
+        raise ValueError(f"Unknown version for {key}: {version}")
+    state = _state(key, manifest, version)
+    if entry.get("key_column"):
+        attrs = pd.read_parquet(_delta_path(key, version, ATTRS_OP))
+        return _to_wide(state, attrs, entry["key_column"], entry["columns"])
+    return state[entry["columns"]].reset_index(drop=True)
+
+
+def versions(key: str) -> list[dict]:
+    """Manifest entries for key, each flagged with whether it can still be reconstructed."""
+    manifest = _load_manifest(key)
+    return [
+        {**e, "available": e["version"] >= manifest["base_version"]}
+        for e in manifest["versions"]
+    ]
+
+
+def compact(key: str, *, keep: int = DEFAULT_KEEP, prune_raw: bool = False) -> int:
+    """Fold old deltas into the base so only the newest `keep` versions stay reconstructable.
+
+    With prune_raw, also delete committed raw files in data/raw/<source>/ except the
+    newest, so _newest_file globs stay small. Returns the new base version.
+    """
+    if keep < 1:
+        raise ValueError("keep must be >= 1")
+    manifest = _load_manifest(key)
+    latest = _latest_version(manifest)
+    new_base = max(latest - keep + 1, manifest["base_version"])
+    if new_base > manifest["base_version"]:
+        state = _state(key, manifest, new_base)
+        state[BUCKET] = (state[ROW_ID] % N_BUCKETS).astype("int32")
+        # Each base lives in its own versioned directory and the manifest switch is the
+        # commit point, so a crash at any step leaves the previous base readable.
+        base_name = _base_name(new_base)
+        base_dir = store_dir(key) / base_name
+        shutil.rmtree(base_dir, ignore_errors=True)
+        ds.write_dataset(
+            pa.Table.from_pandas(state, preserve_index=False),
+            base_dir,
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([(BUCKET, pa.int32())])),
+        )
+        manifest["base_version"] = new_base
+        manifest["base_dir"] = base_name
+        _save_manifest(key, manifest)
+        for old in store_dir(key).glob("base*"):
+            if old.is_dir() and old.name != base_name:
+                shutil.rmtree(old, ignore_errors=True)
+        for v in range(1, new_base + 1):
+            for op in DELTA_OPS:
+                _delta_path(key, v, op).unlink(missing_ok=True)
+            # new_base itself stays loadable and still needs its descriptive columns
+            if v < new_base:
+                _delta_path(key, v, ATTRS_OP).unlink(missing_ok=True)
+        print(f"Compacted {key}: base v{new_base}, {len(state)} rows, {latest - new_base} deltas kept")
+
+    if prune_raw:
+        committed = {e["label"] for e in manifest["versions"] if e["label"]}
+        raw = sorted(
+            (p for p in _source_dir(key).iterdir() if _raw_pattern(key).match(p.name)),
+            key=lambda p: p.stat().st_mtime,
+        )
+        for p in raw[:-1]:
+            if p.name in committed:
+                p.unlink()
+                print(f"Pruned {p.name}")
+    return new_base
+
+
+def ingest(key: str) -> list[int]:
+    """Commit raw files for key not yet in the store, oldest first."""
+    manifest = _load_manifest(key)
+    committed = {e["label"] for e in manifest["versions"]}
+    pending = sorted(
+        (
+            p
+            for p in _source_dir(key).glob(f"{key}_*")
+            if _raw_pattern(key).match(p.name) and p.name not in committed
+        ),
+        key=lambda p: p.stat().st_mtime,
+    )
+    return [commit_file(key, p) for p in pending]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage deduplicated raw snapshot stores")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_ingest = sub.add_parser("ingest", help="Commit raw files not yet in the store")
+    p_ingest.add_argument("key", help="Dataset key, e.g. nyc_crime, acs_2023, zillow_zhvi, fred")
+    p_list = sub.add_parser("list", help="List stored versions")
+    p_list.add_argument("key")
+    p_compact = sub.add_parser("compact", help="Fold old deltas into the base")
+    p_compact.add_argument("key")
+    p_compact.add_argument(
+        "--keep",
+        type=int,
+        default=DEFAULT_KEEP,
+        help=f"Newest versions to keep reconstructable (default: {DEFAULT_KEEP})",
+    )
+    p_compact.add_argument("--prune-raw", action="store_true", help="Delete committed raw files except the newest")
+    args = parser.parse_args()
+    if args.command == "ingest":
+        done = ingest(args.key)
+        print(f"Ingested {len(done)} new snapshot(s) for {args.key}")
+    elif args.command == "list":
+        for e in versions(args.key):
+            flag = "" if e["available"] else " (compacted)"
+            print(f"v{e['version']}  {e['created'][:19]}  rows={e['rows']}  +{e['added']} -{e['removed']}  {e['label']}{flag}")
+    else:
+        compact(args.key, keep=args.keep, prune_raw=args.prune_raw)
+
+
+if __name__ == "__main__":
+    main()
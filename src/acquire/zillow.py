@@ -18,6 +18,7 @@ from ._utils import (
     dataframe_ingest_stats,
 )
 from ._http import get_with_retries
+from .snapshots import commit_run
 
 # Zillow download URLs — may change; check https://www.zillow.com/research/data/
 # Override via env: ZILLOW_ZHVI_URL, ZILLOW_ZORI_URL
@@ -57,6 +58,7 @@ def run_inbox(dataset: str) -> Path | None:
     df.to_csv(out_path, index=False)
     _log_ingest(df, out_path, dataset, "inbox", {"inbox_file": str(latest)})
     _update_sources(dataset, "inbox", {"inbox_file": str(latest)})
+    commit_run(f"zillow_{dataset}", df, out_path)
     print(f"Ingested {len(df)} rows from {latest.name} -> {out_path}")
     # Optionally move/remove inbox file to avoid re-ingestion
     # Keeping it for now; user can delete manually
@@ -81,6 +83,7 @@ def run_download(dataset: str) -> Path | None:
     df.to_csv(out_path, index=False)
     _log_ingest(df, out_path, dataset, "download", {"url": url})
     _update_sources(dataset, "download", {"url": url})
+    commit_run(f"zillow_{dataset}", df, out_path)
     print(f"Downloaded {len(df)} rows -> {out_path}")
     return out_path
 
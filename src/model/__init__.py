@@ -0,0 +1 @@
+"""Modeling utilities over the feature-engineered ZIP-month panel."""
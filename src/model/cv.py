@@ -0,0 +1,348 @@
+"""Rolling-origin (expanding-window) cross-validation over the ZIP-month feature panel."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..acquire._utils import PROCESSED_DIR, ensure_dirs, timestamped_filename
+from .panel import KEY_COLS, load_feature_table
+
+CV_DIR = PROCESSED_DIR / "cv"
+DEFAULT_TARGET = "zhvi"
+DEFAULT_RIDGE_ALPHAS = [0.1, 1.0, 10.0]
+# Known in advance for any month; never a leak
+CALENDAR_COLS = ("year", "month_num", "month_sin", "month_cos")
+LAG_RE = re.compile(r"^.+_lag(\d+)$")
+ROLL_RE = re.compile(r"^.+_roll_(mean|std)_\d+$")
+METRIC_COLS = ("rmse", "mae", "mape", "r2", "fit_seconds", "predict_seconds")
+
+# Set in each worker by _init_worker: name -> ndarray view over shared memory
+_SHARED: dict[str, np.ndarray] = {}
+_SHM_HANDLES: list[shared_memory.SharedMemory] = []
+_FEATURES: list[str] = []
+
+
+def expanding_folds(
+    n_months: int,
+    *,
+    min_train: int = 12,
+    test_size: int = 1,
+    gap: int = 0,
+    step: int = 1,
+) -> list[tuple[int, int, int]]:
+    """Expanding-window folds over month positions 0..n_months-1.
+
+    Each fold is (train_end, test_start, test_end): train on months [0, train_end),
+    skip `gap` months, test on [test_start, test_end).
+    """
+    folds = []
+    train_end = min_train
+    while train_end + gap + test_size <= n_months:
+        test_start = train_end + gap
+        folds.append((train_end, test_start, test_start + test_size))
+        train_end += step
+    return folds
+
+
+def _known_lag(column: str) -> int:
+    """Months between a feature's newest input and the row's month.
+
+    Follows the 03_FeatureEngineer naming: <col>_lagK uses month t-K,
+    <col>_roll_* is computed on values shifted by one month, and every other
+    column (raw values, pct changes) uses month t itself.
+    """
+    if m := LAG_RE.match(column):
+        return int(m.group(1))
+    if ROLL_RE.match(column):
+        return 1
+    return 0
+
+
+def leak_safe_features(
+    df: pd.DataFrame,
+    target: str,
+    *,
+    horizon: int = 1,
+    contemporaneous: bool = False,
+) -> list[str]:
+    """Numeric feature columns that are known `horizon` months after the last training month.
+
+    A time-varying column is kept only if its newest input is at least
+    `horizon` months old (see _known_lag). Calendar columns and columns that
+    are constant within every ZIP (e.g. ACS) are always kept; all-NaN columns
+    are dropped. With contemporaneous=True, same-month values of non-target
+    columns (crime, FRED) are also kept, i.e. they are assumed known at
+    forecast time; target-derived columns always follow the lag rule.
+    """
+    features = []
+    for c in df.columns:
+        if c in KEY_COLS or c == target or not pd.api.types.is_numeric_dtype(df[c]):
+            continue
+        if not df[c].notna().any():
+            continue
+        if c in CALENDAR_COLS or _known_lag(c) >= horizon:
+            features.append(c)
+            continue
+        if contemporaneous and not c.startswith(f"{target}_"):
+            features.append(c)
+            continue
+        if "zip" in df.columns and df.groupby("zip")[c].nunique().max() <= 1:
+            features.append(c)
+    return features
+
+
+def _fit_naive(X: np.ndarray, y: np.ndarray, *, lag_col: int) -> object:
+    """Persistence baseline: predict the most recent allowed target lag."""
+    return lambda Xt: Xt[:, lag_col]
+
+
+def _fit_ridge(X: np.ndarray, y: np.ndarray, *, alpha: float = 1.0) -> object:
+    """Ridge regression on standardized features (closed form, unpenalized intercept)."""
+    mu = X.mean(axis=0)
+    sd = X.std(axis=0)
+    sd[sd == 0] = 1.0
+    Z = (X - mu) / sd
+    y_mu = y.mean()
+    A = Z.T @ Z + alpha * np.eye(Z.shape[1])
+    beta = np.linalg.solve(A, Z.T @ (y - y_mu))
+    return lambda Xt: ((Xt - mu) / sd) @ beta + y_mu
+
+
+MODELS = {
+    "naive": _fit_naive,
+    "ridge": _fit_ridge,
+}
+
+
+def _metrics(y: np.ndarray, pred: np.ndarray) -> dict:
+    err = pred - y
+    ss_tot = float(((y - y.mean()) ** 2).sum())
+    nonzero = y != 0
+    return {
+        "rmse": float(np.sqrt((err**2).mean())),
+        "mae": float(np.abs(err).mean()),
+        "mape": float(np.abs(err[nonzero] / y[nonzero]).mean()) if nonzero.any() else np.nan,
+        "r2": 1 - float((err**2).sum()) / ss_tot if ss_tot > 0 else np.nan,
+    }
+
+
+def _to_shared(arr: np.ndarray) -> tuple[shared_memory.SharedMemory, tuple]:
+    """Copy arr into a new shared memory block. Returns (handle, (name, shape, dtype))."""
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+def _init_worker(specs: dict[str, tuple], features: list[str]) -> None:
+    """Attach to the parent's shared arrays once per worker process."""
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _SHM_HANDLES.append(shm)
+        _SHARED[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    _FEATURES[:] = features
+
+
+def _run_fold(fold_id: int, fold: tuple[int, int, int], config: dict) -> dict:
+    """Fit one model config on one fold using the shared X / y / month arrays."""
+    X, y, month = _SHARED["X"], _SHARED["y"], _SHARED["month"]
+    train_end, test_start, test_end = fold
+    train = np.flatnonzero(month < train_end)
+    test = np.flatnonzero((month >= test_start) & (month < test_end))
+    # Rows missing any feature (e.g. before the first lag12 is available) are dropped
+    train = train[np.isfinite(X[train]).all(axis=1)]
+    test = test[np.isfinite(X[test]).all(axis=1)]
+    row = {"fold": fold_id, "train_end": train_end, "test_start": test_start, "test_end": test_end, **config}
+    row.update({"n_train": len(train), "n_test": len(test)})
+    if len(train) == 0 or len(test) == 0:
+        return row
+
+    params = {k: v for k, v in config.items() if k != "model"}
+    if config["model"] == "naive":
+        params["lag_col"] = _FEATURES.index(params.pop("lag_feature"))
+    t0 = time.perf_counter()
+    predict = MODELS[config["model"]](X[train], y[train], **params)
+    t1 = time.perf_counter()
+    pred = predict(X[test])
+    t2 = time.perf_counter()
+    row.update(_metrics(y[test], pred))
+    row.update({"fit_seconds": t1 - t0, "predict_seconds": t2 - t1})
+    return row
+
+
+def run_cv(
+    df: pd.DataFrame,
+    configs: list[dict],
+    *,
+    target: str = DEFAULT_TARGET,
+    min_train: int = 12,
+    test_size: int = 1,
+    gap: int = 0,
+    step: int = 1,
+    contemporaneous: bool = False,
+    workers: int | None = None,
+) -> pd.DataFrame:
+    """Run every (fold, config) pair in a process pool. Returns one row per pair.
+
+    X, y and month positions are copied into shared memory once; workers attach
+    to them instead of receiving a pickled copy per task.
+    """
+    horizon = gap + test_size
+    features = leak_safe_features(df, target, horizon=horizon, contemporaneous=contemporaneous)
+    if not features:
+        raise ValueError(f"No leak-safe numeric features for target={target}, horizon={horizon}")
+    df = df[df[target].notna()]
+    months = sorted(df["month"].unique())
+    month_pos = pd.Index(months).get_indexer(df["month"]).astype(np.int32)
+    folds = expanding_folds(len(months), min_train=min_train, test_size=test_size, gap=gap, step=step)
+    if not folds:
+        raise ValueError(f"{len(months)} months is too few for min_train={min_train}, gap={gap}, test_size={test_size}")
+
+    arrays = {
+        "X": df[features].to_numpy(dtype=np.float64, na_value=np.nan),
+        "y": df[target].to_numpy(dtype=np.float64),
+        "month": month_pos,
+    }
+    incomplete = ~np.isfinite(arrays["X"]).all(axis=1)
+    print(
+        f"{len(features)} features; {int(incomplete.sum())} of {len(incomplete)} rows "
+        f"missing a feature are skipped in every fold"
+    )
+    handles, specs = [], {}
+    for key, arr in arrays.items():
+        shm, specs[key] = _to_shared(arr)
+        handles.append(shm)
+    del arrays
+
+    rows = []
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            initializer=_init_worker,
+            initargs=(specs, features),
+        ) as pool:
+            futures = [
+                pool.submit(_run_fold, i, fold, cfg)
+                for i, fold in enumerate(folds)
+                for cfg in configs
+            ]
+            for fut in as_completed(futures):
+                rows.append(fut.result())
+    finally:
+        for shm in handles:
+            shm.close()
+            shm.unlink()
+
+    results = pd.DataFrame(rows).sort_values(["fold", "model"]).reset_index(drop=True)
+    results["train_last_month"] = [months[i - 1] for i in results["train_end"]]
+    results["test_first_month"] = [months[i] for i in results["test_start"]]
+    results["target"] = target
+    results["n_features"] = len(features)
+    for col in METRIC_COLS:
+        if col not in results.columns:
+            results[col] = np.nan
+    return results
+
+
+def default_configs(df: pd.DataFrame, target: str, horizon: int, alphas: list[float]) -> list[dict]:
+    """Naive persistence baseline (if a usable target lag exists) plus one ridge per alpha."""
+    configs: list[dict] = []
+    lags = sorted(
+        int(m.group(1))
+        for c in df.columns
+        if (m := re.match(rf"^{re.escape(target)}_lag(\d+)$", c)) and int(m.group(1)) >= horizon
+    )
+    if lags:
+        configs.append({"model": "naive", "lag_feature": f"{target}_lag{lags[0]}"})
+    configs.extend({"model": "ridge", "alpha": a} for a in alphas)
+    return configs
+
+
+def run(
+    in_path: Path | None = None,
+    *,
+    target: str = DEFAULT_TARGET,
+    min_train: int = 12,
+    test_size: int = 1,
+    gap: int = 0,
+    step: int = 1,
+    alphas: list[float] | None = None,
+    contemporaneous: bool = False,
+    workers: int | None = None,
+) -> Path:
+    """Cross-validate default model configs on model_data_fe and save per-fold results as CSV."""
+    df = load_feature_table(in_path)
+    configs = default_configs(df, target, gap + test_size, alphas or DEFAULT_RIDGE_ALPHAS)
+    t0 = time.perf_counter()
+    results = run_cv(
+        df,
+        configs,
+        target=target,
+        min_train=min_train,
+        test_size=test_size,
+        gap=gap,
+        step=step,
+        contemporaneous=contemporaneous,
+        workers=workers,
+    )
+    elapsed = time.perf_counter() - t0
+    ensure_dirs(CV_DIR)
+    prefix = f"cv_{target}_mt{min_train}_ts{test_size}_g{gap}_s{step}"
+    out_path = CV_DIR / timestamped_filename(prefix, "csv")
+    # mode="x": never overwrite an earlier sweep that finished in the same second
+    results.to_csv(out_path, index=False, mode="x")
+    if results["rmse"].notna().any():
+        keys = [c for c in ("model", "alpha") if c in results.columns]
+        summary = results.groupby(keys, dropna=False)[["rmse", "mae", "r2", "fit_seconds"]].mean()
+        print(summary.to_string())
+    else:
+        print("No fold had both training and test rows with complete features; check min_train and missing columns.")
+    print(f"Ran {len(results)} fold/config fits in {elapsed:.1f}s -> {out_path}")
+    return out_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Expanding-window CV over model_data_fe")
+    parser.add_argument("--input", type=Path, default=None, help="Feature table (default: model_data_fe.parquet/.csv)")
+    parser.add_argument("--target", default=DEFAULT_TARGET, help=f"Target column (default: {DEFAULT_TARGET})")
+    parser.add_argument("--min-train", type=int, default=12, help="Months in the first training window")
+    parser.add_argument("--test-size", type=int, default=1, help="Months per test window")
+    parser.add_argument("--gap", type=int, default=0, help="Months skipped between train and test")
+    parser.add_argument("--step", type=int, default=1, help="Months the training window grows per fold")
+    parser.add_argument(
+        "--alphas",
+        type=float,
+        nargs="+",
+        default=DEFAULT_RIDGE_ALPHAS,
+        help=f"Ridge penalties (default: {DEFAULT_RIDGE_ALPHAS})",
+    )
+    parser.add_argument(
+        "--contemporaneous",
+        action="store_true",
+        help="Also use same-month values of non-target columns (assumes they are known at forecast time)",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+    run(
+        args.input,
+        target=args.target,
+        min_train=args.min_train,
+        test_size=args.test_size,
+        gap=args.gap,
+        step=args.step,
+        alphas=args.alphas,
+        contemporaneous=args.contemporaneous,
+        workers=args.workers,
+    )
+
+
+if __name__ == "__main__":
+    main()
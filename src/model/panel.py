@@ -0,0 +1,179 @@
+"""Dense ZIP x month x feature panel: memory-mapped float32 export of model_data_fe."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..acquire._utils import PROCESSED_DIR, ensure_dirs
+
+FE_PARQUET_PATH = PROCESSED_DIR / "model_data_fe.parquet"
+FE_CSV_PATH = PROCESSED_DIR / "model_data_fe.csv"
+PANEL_DIR = PROCESSED_DIR / "panel"
+
+# File layout inside PANEL_DIR
+VALUES_FILE = "values.npy"  # float32 (zip, month, feature), NaN where missing
+MASK_FILE = "mask.npy"  # bool (zip, month, feature), True where value is NaN
+INDEX_FILE = "index.json"  # zips, months, features -> positions
+KEY_COLS = ("zip", "month")
+
+
+@dataclass(frozen=True)
+class FeaturePanel:
+    """Read-only view over an exported panel. All slices are zero-copy views."""
+
+    values: np.ndarray
+    mask: np.ndarray
+    zips: list[str]
+    months: list[str]
+    features: list[str]
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_zip_pos", {z: i for i, z in enumerate(self.zips)})
+        object.__setattr__(self, "_month_pos", {m: i for i, m in enumerate(self.months)})
+        object.__setattr__(self, "_feature_pos", {f: i for i, f in enumerate(self.features)})
+
+    def zip_pos(self, zip_code: str) -> int:
+        return self._zip_pos[str(zip_code).zfill(5)]
+
+    def month_pos(self, month: str) -> int:
+        return self._month_pos[_month_key(month)]
+
+    def feature_pos(self, feature: str) -> int:
+        return self._feature_pos[feature]
+
+    def zip_history(self, zip_code: str) -> np.ndarray:
+        """(month, feature) history for one ZIP."""
+        return self.values[self.zip_pos(zip_code)]
+
+    def month_slice(self, month: str) -> np.ndarray:
+        """(zip, feature) cross-section for one month."""
+        return self.values[:, self.month_pos(month)]
+
+    def feature(self, feature: str) -> np.ndarray:
+        """(zip, month) grid for one feature."""
+        return self.values[:, :, self.feature_pos(feature)]
+
+
+def _month_key(month: object) -> str:
+    """Normalize a month (YYYY-MM string, date string, or timestamp) to 'YYYY-MM'."""
+    return pd.Period(str(month)[:7], freq="M").strftime("%Y-%m")
+
+
+def load_feature_table(path: Path | None = None) -> pd.DataFrame:
+    """Load model_data_fe (parquet preferred, CSV fallback) with zip/month keys normalized."""
+    if path is None:
+        path = FE_PARQUET_PATH if FE_PARQUET_PATH.exists() else FE_CSV_PATH
+    if not path.exists():
+        raise FileNotFoundError(
+            f"No feature table at {path}. Run 03_FeatureEngineer.ipynb through the save cell first."
+        )
+    df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path, dtype={"zip": str})
+    df["zip"] = df["zip"].astype(str).str.zfill(5)
+    df["month"] = pd.to_datetime(df["month"].astype(str), errors="coerce").dt.strftime("%Y-%m")
+    if df["month"].isna().any():
+        raise ValueError("Unparseable values in 'month' column")
+    return df
+
+
+def build_panel(
+    df: pd.DataFrame,
+    out_dir: Path = PANEL_DIR,
+    *,
+    features: list[str] | None = None,
+) -> Path:
+    """Write df (long zip/month table) as a dense memory-mapped panel under out_dir.
+
+    The month axis spans every calendar month between the first and last month,
+    so position arithmetic (e.g. t - 12) is valid; gaps are NaN and masked.
+    Files are written to a sibling temp directory and swapped in, so processes
+    that already have the previous panel mapped keep a consistent view.
+    """
+    if df.duplicated(list(KEY_COLS)).any():
+        raise ValueError("Duplicate (zip, month) rows; panel cells must be unique")
+    if features is None:
+        features = [
+            c for c in df.columns if c not in KEY_COLS and pd.api.types.is_numeric_dtype(df[c])
+        ]
+    zips = sorted(df["zip"].unique())
+    periods = pd.PeriodIndex(df["month"], freq="M")
+    months = pd.period_range(periods.min(), periods.max(), freq="M").strftime("%Y-%m").tolist()
+
+    zi = pd.Index(zips).get_indexer(df["zip"])
+    mi = pd.Index(months).get_indexer(periods.strftime("%Y-%m"))
+    shape = (len(zips), len(months), len(features))
+
+    tmp_dir = out_dir.with_name(f"{out_dir.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    ensure_dirs(tmp_dir)
+    values = np.lib.format.open_memmap(tmp_dir / VALUES_FILE, mode="w+", dtype=np.float32, shape=shape)
+    values[:] = np.nan
+    values[zi, mi] = df[features].to_numpy(dtype=np.float32, na_value=np.nan)
+    mask = np.lib.format.open_memmap(tmp_dir / MASK_FILE, mode="w+", dtype=np.bool_, shape=shape)
+    mask[:] = np.isnan(values)
+    values.flush()
+    mask.flush()
+    del values, mask
+
+    index = {
+        "created": datetime.now().isoformat(),
+        "shape": list(shape),
+        "zips": zips,
+        "months": months,
+        "features": features,
+    }
+    with open(tmp_dir / INDEX_FILE, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+
+    # Never truncate live files: move the old panel aside, then rename the new one in.
+    # Open mappings of the old files stay valid until their readers close them.
+    old_dir = out_dir.with_name(f"{out_dir.name}.old-{os.getpid()}")
+    if out_dir.exists():
+        os.replace(out_dir, old_dir)
+    os.replace(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return out_dir
+
+
+def load_panel(panel_dir: Path = PANEL_DIR) -> FeaturePanel:
+    """Open an exported panel read-only. Pages are shared across processes via the OS cache."""
+    with open(panel_dir / INDEX_FILE, encoding="utf-8") as f:
+        index = json.load(f)
+    values = np.load(panel_dir / VALUES_FILE, mmap_mode="r")
+    mask = np.load(panel_dir / MASK_FILE, mmap_mode="r")
+    if list(values.shape) != index["shape"]:
+        raise ValueError(f"Panel shape {values.shape} does not match index {index['shape']}")
+    return FeaturePanel(values, mask, index["zips"], index["months"], index["features"])
+
+
+def run(in_path: Path | None = None, out_dir: Path = PANEL_DIR) -> Path:
+    """Export model_data_fe as a dense memory-mapped panel."""
+    df = load_feature_table(in_path)
+    build_panel(df, out_dir)
+    panel = load_panel(out_dir)
+    size_mb = (panel.values.nbytes + panel.mask.nbytes) / 1e6
+    print(
+        f"Exported panel {panel.values.shape} (zip x month x feature, "
+        f"{(~panel.mask).mean():.1%} filled, {size_mb:.1f} MB) -> {out_dir}"
+    )
+    return out_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export model_data_fe as a memory-mapped panel")
+    parser.add_argument("--input", type=Path, default=None, help="Feature table (default: model_data_fe.parquet/.csv)")
+    parser.add_argument("--out-dir", type=Path, default=PANEL_DIR, help=f"Output directory (default: {PANEL_DIR})")
+    args = parser.parse_args()
+    run(args.input, args.out_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model import cv
+from src.model.cv import expanding_folds, leak_safe_features, run_cv
+
+
+def _feature_table(n_months: int = 18) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    rows = []
+    for i, z in enumerate(("10001", "10002", "11201")):
+        zhvi = 500_000.0 + 10_000 * i
+        for m in pd.period_range("2023-01", periods=n_months, freq="M"):
+            zhvi *= 1 + rng.normal(0.003, 0.01)
+            rows.append(
+                {
+                    "zip": z,
+                    "month": m.strftime("%Y-%m"),
+                    "zhvi": zhvi,
+                    "crime_per_1000": rng.random(),
+                    "MORTGAGE30US": 6.0 + m.month / 10,
+                    "population": 1000.0 * (i + 1),
+                    "month_sin": np.sin(2 * np.pi * m.month / 12),
+                }
+            )
+    df = pd.DataFrame(rows)
+    g = df.groupby("zip")
+    for col in ("zhvi", "crime_per_1000"):
+        for k in (1, 3):
+            df[f"{col}_lag{k}"] = g[col].shift(k)
+        df[f"{col}_pct_change_1m"] = g[col].pct_change(1)
+        df[f"{col}_roll_mean_3"] = g[col].shift(1).rolling(3).mean().reset_index(level=0, drop=True)
+    return df
+
+
+def test_expanding_folds_boundaries():
+    assert expanding_folds(6, min_train=3) == [(3, 3, 4), (4, 4, 5), (5, 5, 6)]
+    assert expanding_folds(10, min_train=3, test_size=2, gap=1, step=2) == [(3, 4, 6), (5, 6, 8), (7, 8, 10)]
+    assert expanding_folds(4, min_train=3, test_size=2) == []
+
+
+def test_leak_safe_features_one_step():
+    features = set(leak_safe_features(_feature_table(), "zhvi", horizon=1))
+    assert {"zhvi_lag1", "zhvi_lag3", "zhvi_roll_mean_3", "crime_per_1000_lag1", "crime_per_1000_roll_mean_3"} <= features
+    assert {"population", "month_sin"} <= features
+    assert not features & {"zhvi", "zhvi_pct_change_1m", "crime_per_1000", "crime_per_1000_pct_change_1m", "MORTGAGE30US"}
+
+
+def test_leak_safe_features_multi_step_applies_to_all_columns():
+    features = set(leak_safe_features(_feature_table(), "zhvi", horizon=5))
+    assert features == {"population", "month_sin"}
+
+
+def test_leak_safe_features_contemporaneous_is_opt_in():
+    df = _feature_table()
+    features = set(leak_safe_features(df, "zhvi", horizon=1, contemporaneous=True))
+    assert {"crime_per_1000", "crime_per_1000_pct_change_1m", "MORTGAGE30US"} <= features
+    assert not features & {"zhvi", "zhvi_pct_change_1m"}
+
+
+def test_leak_safe_features_drops_all_nan_columns():
+    df = _feature_table().assign(median_income=np.nan)
+    assert "median_income" not in leak_safe_features(df, "zhvi")
+
+
+def test_run_cv_produces_metrics():
+    df = _feature_table()
+    configs = [{"model": "naive", "lag_feature": "zhvi_lag1"}, {"model": "ridge", "alpha": 1.0}]
+    results = run_cv(df, configs, min_train=6, workers=2)
+    assert len(results) == 2 * len(expanding_folds(18, min_train=6))
+    fitted = results[results["n_train"] > 0]
+    assert not fitted.empty and fitted["rmse"].notna().all()
+    assert (results["train_last_month"] < results["test_first_month"]).all()
+
+
+def test_run_without_fitted_folds_writes_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(cv, "CV_DIR", tmp_path)
+    df = _feature_table(n_months=13)
+    # zhvi_lag12 is NaN for the first 12 months, so every training window is empty
+    df["zhvi_lag12"] = df.groupby("zip")["zhvi"].shift(12)
+    monkeypatch.setattr(cv, "load_feature_table", lambda _: df)
+    out = cv.run(min_train=12, alphas=[1.0], workers=1)
+    results = pd.read_csv(out)
+    assert results["rmse"].isna().all()
+    assert out.name.startswith("cv_zhvi_mt12_ts1_g0_s1_")
+
+
+def test_run_refuses_to_overwrite(tmp_path, monkeypatch):
+    monkeypatch.setattr(cv, "CV_DIR", tmp_path)
+    monkeypatch.setattr(cv, "load_feature_table", lambda _: _feature_table())
+    monkeypatch.setattr(cv, "timestamped_filename", lambda prefix, ext: f"{prefix}.{ext}")
+    cv.run(min_train=6, alphas=[1.0], workers=1)
+    with pytest.raises(FileExistsError):
+        cv.run(min_train=6, alphas=[1.0], workers=1)
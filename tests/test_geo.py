@@ -0,0 +1,73 @@
+import zipfile
+
+import pytest
+
+from src.acquire import geo
+
+
+class _FakeResponse:
+    content = b"not really a zip"
+
+
+@pytest.fixture
+def offline_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(geo, "GEO_DIR", tmp_path)
+    monkeypatch.setattr(geo, "get_with_retries", lambda url, timeout: _FakeResponse())
+    monkeypatch.setattr(geo, "write_sources_md", lambda entry: None)
+    calls = []
+    monkeypatch.setattr(geo, "to_nyc_geoparquet", lambda path, simplify=None: calls.append(path))
+    return calls
+
+
+def test_run_skips_nyc_stage_without_geo_extra(offline_run, monkeypatch, capsys):
+    monkeypatch.setattr(geo, "_geo_available", lambda: False)
+    out = geo.run()
+    assert out.exists()
+    assert offline_run == []
+    assert geo.GEO_EXTRA_HINT in capsys.readouterr().out
+
+
+def test_run_builds_nyc_stage_with_geo_extra(offline_run, monkeypatch):
+    monkeypatch.setattr(geo, "_geo_available", lambda: True)
+    out = geo.run()
+    assert offline_run == [out]
+
+
+def test_to_nyc_geoparquet(tmp_path):
+    gpd = pytest.importorskip("geopandas")
+    pytest.importorskip("pyogrio")
+    import pyarrow.parquet as pq
+    from shapely.geometry import box
+
+    rows = [
+        {"ZCTA5CE20": "10001", "geometry": box(-74.00, 40.74, -73.98, 40.76)},
+        {"ZCTA5CE20": "11201", "geometry": box(-74.00, 40.68, -73.98, 40.70)},
+        {"ZCTA5CE20": "11004", "geometry": box(-73.72, 40.73, -73.70, 40.75)},  # Glen Oaks, Queens
+        # Staten Island, extending past the bbox's western edge
+        {"ZCTA5CE20": "10307", "geometry": box(-74.26, 40.50, -74.23, 40.52)},
+        # Inside or touching NYC_BBOX but outside NYC: Hoboken, Yonkers, Nassau
+        {"ZCTA5CE20": "07030", "geometry": box(-74.045, 40.735, -74.020, 40.760)},
+        {"ZCTA5CE20": "10701", "geometry": box(-73.91, 40.91, -73.86, 40.96)},
+        {"ZCTA5CE20": "11001", "geometry": box(-73.72, 40.71, -73.69, 40.73)},
+        {"ZCTA5CE20": "90210", "geometry": box(-118.42, 34.08, -118.38, 34.11)},
+    ]
+    shp_dir = tmp_path / "shp"
+    shp_dir.mkdir()
+    gpd.GeoDataFrame(rows, crs="EPSG:4269").to_file(shp_dir / "tl_2023_us_zcta520.shp")
+    zip_path = tmp_path / "tl_2023_us_zcta520.zip"
+    with zipfile.ZipFile(zip_path, "w") as z:
+        for p in shp_dir.iterdir():
+            z.write(p, p.name)
+
+    assert all(box(*geo.NYC_BBOX).intersects(r["geometry"]) for r in rows[:-1])
+    out = geo.to_nyc_geoparquet(zip_path, out_path=tmp_path / "nyc.parquet", simplify=0.0001)
+    nyc = geo.load_nyc_zcta(path=out)
+    assert sorted(nyc["zip"]) == ["10001", "10307", "11004", "11201"]
+    # Not clipped to the bbox
+    assert nyc.set_index("zip").loc["10307", "geometry"].bounds == pytest.approx((-74.26, 40.50, -74.23, 40.52))
+    assert nyc.crs.to_epsg() == 4269
+    assert "bbox" in pq.read_schema(out).names
+    assert list(geo.load_nyc_zcta(bbox=(-74.0, 40.745, -73.99, 40.75), path=out)["zip"]) == ["10001"]
+
+    panel = geo.to_nyc_geoparquet(zip_path, out_path=tmp_path / "panel.parquet", zips=["11201", "07030"])
+    assert sorted(geo.load_nyc_zcta(path=panel)["zip"]) == ["07030", "11201"]
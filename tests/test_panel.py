@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.panel import build_panel, load_panel
+
+
+def _feature_table() -> pd.DataFrame:
+    rows = []
+    for z in ("10001", "11201"):
+        for i, m in enumerate(pd.period_range("2023-01", "2023-06", freq="M")):
+            rows.append({"zip": z, "month": m.strftime("%Y-%m"), "zhvi": 100.0 * (i + 1), "crime": float(i)})
+    df = pd.DataFrame(rows)
+    # Drop one cell (10001, 2023-03) so the month axis has a gap for that ZIP
+    return df[~((df["zip"] == "10001") & (df["month"] == "2023-03"))].reset_index(drop=True)
+
+
+def test_export_load_roundtrip(tmp_path):
+    out = build_panel(_feature_table(), tmp_path / "panel")
+    panel = load_panel(out)
+
+    assert panel.values.shape == (2, 6, 2)
+    assert panel.values.dtype == np.float32
+    assert panel.zips == ["10001", "11201"]
+    assert panel.months[0] == "2023-01" and panel.months[-1] == "2023-06"
+    assert panel.features == ["zhvi", "crime"]
+
+    hist = panel.zip_history("10001")
+    assert np.shares_memory(hist, panel.values)
+    assert hist[0, panel.feature_pos("zhvi")] == 100.0
+    assert np.isnan(hist[2]).all()
+    assert panel.mask[panel.zip_pos("10001"), panel.month_pos("2023-03")].all()
+    assert not panel.mask[panel.zip_pos("11201")].any()
+    assert panel.month_slice("2023-06-30")[:, 0].tolist() == [600.0, 600.0]
+    assert panel.feature("crime").shape == (2, 6)
+
+
+def test_reexport_keeps_open_mapping_valid(tmp_path):
+    out = build_panel(_feature_table(), tmp_path / "panel")
+    old = load_panel(out)
+    before = np.array(old.values)
+
+    df = _feature_table()
+    df["zhvi"] *= 2
+    build_panel(df, out)
+
+    np.testing.assert_array_equal(np.array(old.values), before)
+    assert load_panel(out).zip_history("11201")[0, 0] == 200.0
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["panel"]
+
+
+def test_duplicate_cells_rejected(tmp_path):
+    df = _feature_table()
+    with pytest.raises(ValueError, match="Duplicate"):
+        build_panel(pd.concat([df, df.iloc[:1]]), tmp_path / "panel")
@@ -0,0 +1,216 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.acquire import snapshots as S
+
+
+@pytest.fixture(autouse=True)
+def raw_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(S, "RAW_DIR", tmp_path)
+    for d in S.SOURCE_DIRS:
+        (tmp_path / d).mkdir()
+    return tmp_path
+
+
+def _canon(df: pd.DataFrame) -> pd.DataFrame:
+    """Order-insensitive, nested-cell-insensitive form for comparing snapshots."""
+    out = df.apply(lambda col: col.map(lambda v: json.dumps(S._canonical(v), sort_keys=True, default=str)))
+    return out.sort_values(list(out.columns)).reset_index(drop=True)
+
+
+def _assert_same(a: pd.DataFrame, b: pd.DataFrame) -> None:
+    assert list(a.columns) == list(b.columns)
+    pd.testing.assert_frame_equal(_canon(a), _canon(b))
+
+
+def _crime(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "cmplnt_num": [str(i) for i in range(n)],
+            "ofns_desc": rng.choice(["ASSAULT", "LARCENY"], n),
+            "latitude": rng.uniform(40.5, 40.9, n).round(4).astype(str),
+        }
+    )
+
+
+def test_commit_load_compact_roundtrip(raw_dir):
+    snaps = []
+    df = _crime(200, 0)
+    for v in range(1, 6):
+        df = df.copy()
+        df.loc[v * 10 : v * 10 + 4, "ofns_desc"] = f"CHANGED{v}"
+        df = pd.concat([df.iloc[3:], df.iloc[:1]], ignore_index=True)  # drop rows, add a duplicate
+        snaps.append(df)
+        assert S.commit("nyc_crime", df, label=f"run{v}") == v
+
+    entries = S.versions("nyc_crime")
+    assert entries[0]["added"] == len(snaps[0])
+    assert all(e["added"] < len(snaps[0]) / 2 for e in entries[1:])
+    for v, expected in enumerate(snaps, 1):
+        _assert_same(S.load("nyc_crime", v), expected)
+
+    assert S.compact("nyc_crime", keep=2) == 4
+    _assert_same(S.load("nyc_crime", 4), snaps[3])
+    _assert_same(S.load("nyc_crime"), snaps[4])
+    with pytest.raises(ValueError, match="compacted away"):
+        S.load("nyc_crime", 2)
+    assert [p.name for p in S.store_dir("nyc_crime").glob("base*")] == ["base.v000004"]
+
+    S.commit("nyc_crime", snaps[0], label="run6")
+    _assert_same(S.load("nyc_crime", 6), snaps[0])
+
+
+def test_load_unknown_version(raw_dir):
+    S.commit("fred", pd.DataFrame({"date": ["2024-01-01"], "value": [1.0]}))
+    with pytest.raises(ValueError, match="Unknown version"):
+        S.load("fred", 0)
+    with pytest.raises(ValueError, match="Unknown version"):
+        S.load("fred", 2)
+
+
+def test_nested_columns_roundtrip(raw_dir):
+    # Socrata JSON: dict cells with keys missing on some rows
+    df = _crime(4, 1)
+    df["lat_lon"] = [{"latitude": "40.7", "longitude": "-73.9"}, {"latitude": "40.8"}, None, {"latitude": "40.6", "longitude": "-74.0"}]
+    df["geocoded_column"] = [{"type": "Point", "coordinates": [-73.9, 40.7]}] * 3 + [None]
+    S.commit("nyc_crime", df, label="a")
+    _assert_same(S.load("nyc_crime"), df)
+
+    # The same rows read back from parquet (structs with None fields, arrays) hash identically
+    path = raw_dir / "nyc_crime" / "nyc_crime_20260101_000000.parquet"
+    df.to_parquet(path, index=False)
+    S.commit_file("nyc_crime", path)
+    assert S.versions("nyc_crime")[-1]["added"] == 0
+
+    changed = df.copy()
+    changed.at[1, "lat_lon"] = {"latitude": "40.9"}
+    S.commit("nyc_crime", changed)
+    assert S.versions("nyc_crime")[-1]["added"] == 1
+    _assert_same(S.load("nyc_crime"), changed)
+    _assert_same(S.load("nyc_crime", 1), df)
+
+
+def _zillow(dates: list[str], seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "RegionID": [62037, 61615, 61616],
+            "SizeRank": [10, 20, 30],
+            "RegionName": [11201, 10001, 10002],
+            "Metro": ["New York", "New York", None],
+        }
+    )
+    for d in dates:
+        df[d] = rng.uniform(5e5, 1e6, len(df)).round(0)
+    df.loc[2, dates[0]] = np.nan
+    return df
+
+
+def test_wide_zillow_stored_long(raw_dir):
+    v1 = _zillow(["2024-01-31", "2024-02-29", "2024-03-31"])
+    v2 = v1.copy()
+    v2["2024-04-30"] = [1.0, 2.0, 3.0]
+    v2.loc[0, "2024-03-31"] += 1000  # revised cell
+    # Descriptive columns change without touching any monthly value
+    v2.loc[1, "SizeRank"] = 5
+    v2.loc[2, "Metro"] = "New York"
+
+    S.commit("zillow_zhvi", v1)
+    S.commit("zillow_zhvi", v2)
+    entry = S.versions("zillow_zhvi")[-1]
+    assert (entry["added"], entry["removed"]) == (3 + 1, 1)
+
+    for v, expected in ((1, v1), (2, v2)):
+        pd.testing.assert_frame_equal(S.load("zillow_zhvi", v), expected, check_dtype=False)
+
+    S.compact("zillow_zhvi", keep=1)
+    pd.testing.assert_frame_equal(S.load("zillow_zhvi"), v2, check_dtype=False)
+
+
+def test_nyc_crime_datasets_use_separate_keys(raw_dir):
+    src = raw_dir / "nyc_crime"
+    _crime(20, 0).to_parquet(src / "nyc_crime_20260101_000000.parquet", index=False)
+    _crime(30, 1).to_parquet(src / "nyc_crime_historic_20260102_000000.parquet", index=False)
+    assert S.ingest("nyc_crime") == [1]
+    assert S.ingest("nyc_crime_historic") == [1]
+    _assert_same(S.load("nyc_crime"), _crime(20, 0))
+    _assert_same(S.load("nyc_crime_historic"), _crime(30, 1))
+
+
+def test_failed_compaction_keeps_previous_base(raw_dir, monkeypatch):
+    for seed in range(3):
+        S.commit("nyc_crime", _crime(50, seed))
+    S.compact("nyc_crime", keep=2)
+    S.commit("nyc_crime", _crime(50, 3))
+    expected = S.load("nyc_crime")
+
+    def boom(key, manifest):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(S, "_save_manifest", boom)
+    with pytest.raises(OSError):
+        S.compact("nyc_crime", keep=1)
+    monkeypatch.undo()
+    monkeypatch.setattr(S, "RAW_DIR", raw_dir)
+    _assert_same(S.load("nyc_crime"), expected)
+
+
+def test_missing_base_raises(raw_dir):
+    for seed in range(3):
+        S.commit("nyc_crime", _crime(20, seed))
+    S.compact("nyc_crime", keep=1)
+    for p in S.store_dir("nyc_crime").glob("base*"):
+        p.rename(p.with_name("moved"))
+    with pytest.raises(FileNotFoundError, match="missing"):
+        S.load("nyc_crime")
+
+
+def test_ingest_and_prune_raw(raw_dir):
+    src = raw_dir / "nyc_crime"
+    for i in range(3):
+        p = src / f"nyc_crime_2026010{i}_000000.parquet"
+        _crime(30, i).to_parquet(p, index=False)
+        os.utime(p, (i + 1, i + 1))
+    assert S.ingest("nyc_crime") == [1, 2, 3]
+    assert S.ingest("nyc_crime") == []
+
+    uncommitted = src / "nyc_crime_20250101_000000.parquet"
+    _crime(5, 9).to_parquet(uncommitted, index=False)
+    os.utime(uncommitted, (0, 0))
+    S.compact("nyc_crime", keep=1, prune_raw=True)
+    assert sorted(p.name for p in src.glob("*.parquet")) == [uncommitted.name, "nyc_crime_20260102_000000.parquet"]
+    _assert_same(S.load("nyc_crime"), _crime(30, 2))
+
+
+def test_commit_run_is_non_fatal(raw_dir, monkeypatch, capsys):
+    def boom(*args, **kwargs):
+        raise TypeError("unhashable")
+
+    monkeypatch.setattr(S, "commit", boom)
+    assert S.commit_run("fred", pd.DataFrame({"a": [1]}), raw_dir / "fred" / "fred_x.csv") is None
+    assert "snapshot commit for fred failed" in capsys.readouterr().out
+
+
+def test_failed_commit_leaves_no_stale_delta(raw_dir, monkeypatch):
+    def frame(ids):
+        return pd.DataFrame({"series_id": ids})
+
+    S.commit("fred", frame(["1", "2", "3"]))
+
+    def boom(key, manifest):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(S, "_save_manifest", boom)
+    with pytest.raises(OSError):
+        S.commit("fred", frame(["1"]))
+    monkeypatch.undo()
+    monkeypatch.setattr(S, "RAW_DIR", raw_dir)
+
+    _assert_same(S.load("fred"), frame(["1", "2", "3"]))
+    assert S.commit("fred", frame(["1", "2", "3", "4"])) == 2
+    _assert_same(S.load("fred"), frame(["1", "2", "3", "4"]))